@@ -0,0 +1,149 @@
+//! Dump Excel layout (sheet names + first rows, cell by cell) to JSON for inspecting templates.
+//! Thin CLI over `excel::write_excel_structure`; run from src-tauri (`npm run excel:dump`).
+//! Dev-only, so it lives under examples/ rather than src/bin (which tauri bundles into the installer).
+//!
+//!   cargo run --example dump_excel -- <file.xlsx> [max_rows]   → JSON on stdout
+//!   cargo run --example dump_excel -- --all                    → every workbook under ../example into ../excel-structures/
+
+use invoice_scanner_lib::excel;
+use std::fs;
+use std::io::{BufWriter, Write};
+use std::path::{Path, PathBuf};
+
+const DEFAULT_MAX_ROWS: usize = 50;
+const EXAMPLES_DIR: &str = "../example";
+const OUTPUT_DIR: &str = "../excel-structures";
+
+fn main() {
+    let args: Vec<String> = std::env::args().skip(1).collect();
+    let result = match args.first().map(String::as_str) {
+        Some("--all") => dump_all(),
+        Some(path) => {
+            let max_rows = args
+                .get(1)
+                .and_then(|s| s.parse().ok())
+                .unwrap_or(DEFAULT_MAX_ROWS);
+            dump_to_stdout(path, max_rows)
+        }
+        None => Err("Usage: dump_excel <file.xlsx> [max_rows] | --all".to_string()),
+    };
+    if let Err(e) = result {
+        eprintln!("{}", e);
+        std::process::exit(1);
+    }
+}
+
+/// Write the `--all` report with one call on a locked stdout. Stdout is line-buffered, so printing
+/// the report line by line flushes once per workbook; this also reports a closed pipe as an error instead of panicking.
+fn write_report(text: &str) -> Result<(), String> {
+    let mut out = std::io::stdout().lock();
+    out.write_all(text.as_bytes())
+        .and_then(|_| out.flush())
+        .map_err(|e| format!("stdout: {}", e))
+}
+
+/// Serialize the dump straight into a buffered, locked stdout; no JSON String is built first.
+fn dump_to_stdout(path: &str, max_rows: usize) -> Result<(), String> {
+    let mut out = BufWriter::new(std::io::stdout().lock());
+    excel::write_excel_structure(path, max_rows, &mut out)?;
+    out.write_all(b"\n")
+        .and_then(|_| out.flush())
+        .map_err(|e| format!("stdout: {}", e))
+}
+
+/// Recursively collect .xlsx / .xlsm / .xls files under `dir`.
+fn collect_workbooks(dir: &Path, out: &mut Vec<PathBuf>) {
+    let Ok(entries) = fs::read_dir(dir) else {
+        return;
+    };
+    for entry in entries.flatten() {
+        let path = entry.path();
+        if path.is_dir() {
+            collect_workbooks(&path, out);
+            continue;
+        }
+        let ext = path
+            .extension()
+            .and_then(|e| e.to_str())
+            .map(|e| e.to_lowercase())
+            .unwrap_or_default();
+        if matches!(ext.as_str(), "xlsx" | "xlsm" | "xls") {
+            out.push(path);
+        }
+    }
+}
+
+/// Output file name: workbook stem with spaces replaced (e.g. "РД-ДДВ-Example.json").
+fn output_name(path: &Path) -> String {
+    let stem = path
+        .file_stem()
+        .map(|s| s.to_string_lossy().replace(' ', "_"))
+        .unwrap_or_else(|| "workbook".to_string());
+    format!("{}.json", stem)
+}
+
+/// Dump one workbook to OUTPUT_DIR, streaming the JSON into the file; returns the written path.
+fn dump_one(path: &Path, out_dir: &Path) -> Result<PathBuf, String> {
+    let dest = out_dir.join(output_name(path));
+    let file = fs::File::create(&dest).map_err(|e| format!("{}: {}", dest.display(), e))?;
+    let mut writer = BufWriter::new(file);
+    let written = excel::write_excel_structure(&path.to_string_lossy(), DEFAULT_MAX_ROWS, &mut writer)
+        .and_then(|_| writer.flush().map_err(|e| format!("{}: {}", dest.display(), e)));
+    if let Err(e) = written {
+        drop(writer);
+        let _ = fs::remove_file(&dest);
+        return Err(e);
+    }
+    Ok(dest)
+}
+
+/// Dump every example workbook into OUTPUT_DIR, one JSON file per workbook.
+/// Workbooks are independent and parsing is CPU-bound, so they are split across threads.
+fn dump_all() -> Result<(), String> {
+    let mut files = Vec::new();
+    collect_workbooks(Path::new(EXAMPLES_DIR), &mut files);
+    files.sort();
+    if files.is_empty() {
+        return Err(format!("No Excel files found under {}", EXAMPLES_DIR));
+    }
+    let out_dir = Path::new(OUTPUT_DIR);
+    fs::create_dir_all(out_dir).map_err(|e| format!("{}: {}", out_dir.display(), e))?;
+
+    let workers = std::thread::available_parallelism()
+        .map_or(1, |n| n.get())
+        .min(files.len());
+    let chunk_size = files.len().div_ceil(workers);
+    let results: Vec<Result<PathBuf, String>> = std::thread::scope(|scope| {
+        let handles: Vec<_> = files
+            .chunks(chunk_size)
+            .map(|batch| {
+                let handle = scope.spawn(move || batch.iter().map(|p| dump_one(p, out_dir)).collect::<Vec<_>>());
+                (batch.len(), handle)
+            })
+            .collect();
+        // One result per file even if a thread panics, so results stay aligned with `files`.
+        handles
+            .into_iter()
+            .flat_map(|(len, h)| {
+                h.join()
+                    .unwrap_or_else(|_| vec![Err("Dump thread panicked".to_string()); len])
+            })
+            .collect()
+    });
+
+    // Report every written file in file order, then fail with all errors at once.
+    let mut report = String::new();
+    let mut errors = Vec::new();
+    for (path, result) in files.iter().zip(results) {
+        match result {
+            Ok(dest) => report.push_str(&format!("{} -> {}\n", path.display(), dest.display())),
+            Err(e) => errors.push(format!("{}: {}", path.display(), e)),
+        }
+    }
+    write_report(&report)?;
+    if errors.is_empty() {
+        Ok(())
+    } else {
+        Err(errors.join("\n"))
+    }
+}
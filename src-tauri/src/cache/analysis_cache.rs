@@ -0,0 +1,74 @@
+use crate::excel::AnalyzedSchema;
+use std::collections::HashMap;
+use std::path::Path;
+use std::sync::{Arc, RwLock};
+use std::time::UNIX_EPOCH;
+
+/// Size and modification time of the file an analysis was computed from.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct FileStamp {
+    pub size: u64,
+    pub mtime_ns: u128,
+}
+
+/// Latest analysis of one file. Analyzing another sheet or header row of the same file replaces it,
+/// so the cache holds at most one entry per path.
+struct CachedAnalysis {
+    stamp: FileStamp,
+    sheet_name: String,
+    header_row: u32,
+    analysis: AnalyzedSchema,
+}
+
+static CACHE: std::sync::OnceLock<Arc<RwLock<HashMap<String, CachedAnalysis>>>> = std::sync::OnceLock::new();
+
+fn cache() -> &'static Arc<RwLock<HashMap<String, CachedAnalysis>>> {
+    CACHE.get_or_init(|| Arc::new(RwLock::new(HashMap::new())))
+}
+
+pub fn file_stamp(path: &Path) -> Option<FileStamp> {
+    let metadata = std::fs::metadata(path).ok()?;
+    let mtime_ns = metadata.modified().ok()?.duration_since(UNIX_EPOCH).ok()?.as_nanos();
+    Some(FileStamp {
+        size: metadata.len(),
+        mtime_ns,
+    })
+}
+
+/// Cached analysis for this sheet/header row, only if the file still has the same size and mtime.
+pub fn get_cached_analysis(path: &str, sheet_name: &str, header_row: u32, stamp: FileStamp) -> Option<AnalyzedSchema> {
+    let guard = cache().read().ok()?;
+    let cached = guard.get(path)?;
+    if cached.stamp == stamp && cached.sheet_name == sheet_name && cached.header_row == header_row {
+        Some(cached.analysis.clone())
+    } else {
+        None
+    }
+}
+
+pub fn set_cached_analysis(path: &str, sheet_name: &str, header_row: u32, stamp: FileStamp, analysis: AnalyzedSchema) {
+    if let Ok(mut guard) = cache().write() {
+        guard.insert(
+            path.to_string(),
+            CachedAnalysis {
+                stamp,
+                sheet_name: sheet_name.to_string(),
+                header_row,
+                analysis,
+            },
+        );
+    }
+}
+
+pub fn invalidate_cache(path: &str) {
+    if let Ok(mut guard) = cache().write() {
+        guard.remove(path);
+    }
+}
+
+#[allow(dead_code)]
+pub fn clear_all_cache() {
+    if let Ok(mut guard) = cache().write() {
+        guard.clear();
+    }
+}
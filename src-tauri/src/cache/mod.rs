@@ -1 +1,2 @@
+pub mod analysis_cache;
 pub mod schema_cache;
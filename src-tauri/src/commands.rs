@@ -1,4 +1,4 @@
-use crate::cache::schema_cache;
+use crate::cache::{analysis_cache, schema_cache};
 use crate::db::Db;
 use crate::excel;
 use crate::models::ExcelSchema;
@@ -376,18 +376,26 @@ pub async fn copy_template_and_append_rows(
     let inv = invoices;
     tauri::async_runtime::spawn_blocking(move || {
         fs::copy(Path::new(&template_path), Path::new(&dest)).map_err(|e| e.to_string())?;
-        let mut row = schema.next_free_row;
-        for invoice in &inv {
-            let mut column_values = Vec::new();
-            for h in &schema.headers {
+        // Column → field key is the same for every invoice; resolve it once instead of per row.
+        let header_keys: Vec<(&String, String)> = schema
+            .headers
+            .iter()
+            .map(|h| {
                 let field_key = column_mapping
                     .get(&h.column_letter)
                     .or_else(|| column_mapping.get(&h.column_letter.to_uppercase()))
                     .map(String::from)
                     .unwrap_or_else(|| format!("col_{}", h.column_letter));
+                (&h.column_letter, field_key)
+            })
+            .collect();
+        let mut row = schema.next_free_row;
+        for invoice in &inv {
+            let mut column_values = Vec::with_capacity(header_keys.len());
+            for (column_letter, field_key) in &header_keys {
                 let mut value = invoice
                     .fields
-                    .get(&field_key)
+                    .get(field_key)
                     .map(|v| v.value.clone())
                     .unwrap_or_default();
                 // DDV template: write month name (e.g. "Февруари") in Период column instead of full date range
@@ -396,7 +404,7 @@ pub async fn copy_template_and_append_rows(
                         value = month_name;
                     }
                 }
-                column_values.push((h.column_letter.clone(), value));
+                column_values.push(((*column_letter).clone(), value));
             }
             excel::append_row_to_excel_at_row(&dest, &sheet, row, column_values)?;
             row += 1;
@@ -901,7 +909,20 @@ pub async fn analyze_excel_schema(
     let path = path.clone();
     let sheet_name = sheet_name.clone();
     tauri::async_runtime::spawn_blocking(move || {
-        excel::analyze_excel_schema(&path, &sheet_name, header_row)
+        // Same file (size + mtime) already analyzed for this sheet/header row: skip re-parsing the workbook.
+        let stamp = analysis_cache::file_stamp(Path::new(&path));
+        if let Some(cached) =
+            stamp.and_then(|s| analysis_cache::get_cached_analysis(&path, &sheet_name, header_row, s))
+        {
+            return Ok(cached);
+        }
+        // Stale or for another sheet/header row: drop it so a failed analysis leaves nothing behind.
+        analysis_cache::invalidate_cache(&path);
+        let analysis = excel::analyze_excel_schema(&path, &sheet_name, header_row)?;
+        if let Some(s) = stamp {
+            analysis_cache::set_cached_analysis(&path, &sheet_name, header_row, s, analysis.clone());
+        }
+        Ok(analysis)
     })
     .await
     .map_err(|e| e.to_string())?
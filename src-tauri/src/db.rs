@@ -833,20 +833,6 @@ const TAX_BALANCE_CANONICAL_COLUMNS: &[(u16, &str)] = &[
     (13, "amountToPayOrOverpaid"),
 ];
 
-fn column_index_to_letter(index: u16) -> String {
-    let mut n = index as u32;
-    let mut s = String::new();
-    loop {
-        let r = (n % 26) as u8;
-        s.insert(0, (b'A' + r) as char);
-        if n < 26 {
-            break;
-        }
-        n = n / 26 - 1;
-    }
-    s
-}
-
 impl Db {
     /// Seed default profiles when DB has no profiles. For Даночен биланс we scan the template
     /// to detect header row and save the full Excel schema so export matches the template exactly.
@@ -957,14 +943,14 @@ impl Db {
                         // Template has merged header row (one cell with all labels): use canonical A..N column order.
                         let mut map = serde_json::Map::new();
                         for (idx, key) in TAX_BALANCE_CANONICAL_COLUMNS {
-                            map.insert(column_index_to_letter(*idx), serde_json::Value::String((*key).to_string()));
+                            map.insert(excel::col_index_to_letter(*idx as u32).into_owned(), serde_json::Value::String((*key).to_string()));
                         }
                         map.insert("_headerRow".to_string(), serde_json::Value::Number(serde_json::Number::from(header_row)));
                         let mapping = serde_json::Value::Object(map).to_string();
                         let schema_headers: Vec<HeaderInfo> = TAX_BALANCE_CANONICAL_COLUMNS.iter()
                             .map(|(idx, key)| HeaderInfo {
                                 column_index: *idx,
-                                column_letter: column_index_to_letter(*idx),
+                                column_letter: excel::col_index_to_letter(*idx as u32).into_owned(),
                                 text: key.to_string(),
                             })
                             .collect();
@@ -1,21 +1,37 @@
-use calamine::{open_workbook_auto, DataType, Reader};
+use calamine::{open_workbook_auto, Data, DataType, Range, Reader};
 use edit_xlsx::{FormatAlignType, WorkSheetRow, Write};
 use quick_xml::events::{BytesEnd, BytesStart, BytesText, Event};
 use quick_xml::Reader as XmlReader;
 use quick_xml::Writer;
 use regex::Regex;
-use std::collections::HashMap;
+use std::borrow::Cow;
+use std::collections::{BTreeMap, HashMap};
 use std::io::{Cursor, Read, Write as IoWrite};
 use std::path::Path;
 use zip::read::ZipArchive;
 use zip::write::SimpleFileOptions;
 use zip::ZipWriter;
 
+use crate::services::xlsx_reader;
 use crate::types::InvoiceData;
 use rust_xlsxwriter::{Format, FormatAlign, Workbook, Worksheet, XlsxError};
 
+/// Columns A..ZZ; covers every template and export width, so letters are built once and reused.
+const CACHED_COLUMN_LETTERS: u32 = 26 * 27;
+
+static COLUMN_LETTERS: std::sync::OnceLock<Vec<String>> = std::sync::OnceLock::new();
+
 /// Column index to Excel letter (0→A, 1→B, 25→Z, 26→AA).
-fn col_index_to_letter(index: u32) -> String {
+/// Letters up to ZZ are borrowed from a table built once; only wider indices allocate.
+pub(crate) fn col_index_to_letter(index: u32) -> Cow<'static, str> {
+    let letters = COLUMN_LETTERS.get_or_init(|| (0..CACHED_COLUMN_LETTERS).map(build_column_letter).collect());
+    match letters.get(index as usize) {
+        Some(letter) => Cow::Borrowed(letter.as_str()),
+        None => Cow::Owned(build_column_letter(index)),
+    }
+}
+
+fn build_column_letter(index: u32) -> String {
     let mut n = index;
     let mut s = String::new();
     loop {
@@ -50,7 +66,7 @@ pub fn get_excel_headers(
         .into_iter()
         .enumerate()
         .map(|(i, header_text)| ExcelHeader {
-            column_letter: col_index_to_letter(i as u32),
+            column_letter: col_index_to_letter(i as u32).into_owned(),
             header_text,
             column_index: i as u32,
         })
@@ -58,26 +74,61 @@ pub fn get_excel_headers(
     Ok(out)
 }
 
-/// Read a specific row from sheet as headers (1-based row index).
-/// Returns header values in column order (A, B, C, ...).
+/// Open a workbook (any format calamine supports) and load one sheet's used range.
+/// Shared by every calamine-based reader so they open files and report errors the same way.
+pub(crate) fn open_sheet_range(path: &Path, sheet_name: &str) -> Result<Range<Data>, String> {
+    let mut workbook = open_workbook_auto(path).map_err(|e| format!("Could not open Excel file: {}", e))?;
+    workbook
+        .worksheet_range(sheet_name)
+        .map_err(|e| format!("Sheet not found: {}", e))
+}
+
+/// Read a specific row from sheet as headers (1-based sheet row, as shown in Excel).
+/// Returns header values in column order starting at column A, without trailing empty cells.
+/// For .xlsx the row is streamed from the sheet XML (stops after the header row); other formats use calamine.
 pub fn read_excel_headers(path: &str, sheet_name: &str, header_row: Option<u32>) -> Result<Vec<String>, String> {
     let path = Path::new(path);
     if !path.exists() {
         return Err("File not found. Browse to select again.".to_string());
     }
-    let mut workbook = open_workbook_auto(path).map_err(|e| format!("Could not open Excel file: {}", e))?;
-    let range = workbook
-        .worksheet_range(sheet_name)
-        .map_err(|e| format!("Sheet not found: {}", e))?;
-    let row_index = header_row.unwrap_or(1).saturating_sub(1) as usize; // 1-based -> 0-based
-    let mut headers = Vec::new();
-    if let Some(row) = range.rows().nth(row_index) {
-        for cell in row {
-            let s = cell.as_string().unwrap_or_default();
-            headers.push(s);
-        }
+    let header_row = header_row.unwrap_or(1).max(1);
+    if let Some(headers) = xlsx_reader::read_row(path, sheet_name, header_row) {
+        return Ok(headers);
     }
-    Ok(headers)
+    let range = open_sheet_range(path, sheet_name)?;
+    Ok(row_strings(&range, header_row - 1))
+}
+
+/// Rows of `range` with their absolute 0-based sheet row, starting at sheet row `from_row` and covering
+/// at most `count` sheet rows. calamine ranges begin at the first used cell, not at A1, so range-relative
+/// indices are shifted back to sheet rows; this keeps every reader on the same coordinates as Excel and edit-xlsx.
+fn sheet_rows(range: &Range<Data>, from_row: u32, count: usize) -> impl Iterator<Item = (u32, &[Data])> {
+    let start_row = range.start().map_or(0, |(r, _)| r);
+    let end_row = (from_row as u64).saturating_add(count as u64);
+    range
+        .rows()
+        .enumerate()
+        .skip(from_row.saturating_sub(start_row) as usize)
+        .map(move |(i, row)| (start_row + i as u32, row))
+        .take_while(move |(r, _)| (*r as u64) < end_row)
+}
+
+/// First absolute column of `range` (0 = A); cells of a calamine row start at this column.
+fn first_column(range: &Range<Data>) -> usize {
+    range.start().map_or(0, |(_, c)| c as usize)
+}
+
+/// One sheet row (absolute, 0-based) as display strings from column A, trailing empty cells trimmed.
+fn row_strings(range: &Range<Data>, row: u32) -> Vec<String> {
+    let Some((_, cells)) = sheet_rows(range, row, 1).next() else {
+        return Vec::new();
+    };
+    let mut values = vec![String::new(); first_column(range)];
+    values.extend(cells.iter().map(|c| c.as_string().unwrap_or_default()));
+    while values.last().map_or(false, |s| s.trim().is_empty()) {
+        values.pop();
+    }
+    values
 }
 
 /// Read sample values from columns (rows below header). Returns Vec<Vec<String>>: columns × rows.
@@ -91,93 +142,112 @@ pub fn read_excel_column_samples(
     if !path.exists() {
         return Err("File not found. Browse to select again.".to_string());
     }
-    let mut workbook = open_workbook_auto(path).map_err(|e| format!("Could not open Excel file: {}", e))?;
-    let range = workbook
-        .worksheet_range(sheet_name)
-        .map_err(|e| format!("Sheet not found: {}", e))?;
-    let header_idx = header_row.unwrap_or(1).saturating_sub(1) as usize;
-    let rows: Vec<Vec<String>> = range
-        .rows()
-        .skip(header_idx + 1)
-        .take(max_rows)
-        .map(|row| {
-            row.iter()
-                .map(|c| c.as_string().unwrap_or_default())
-                .collect()
-        })
-        .collect();
-    if rows.is_empty() {
-        return Ok(vec![]);
-    }
-    let num_cols = rows[0].len();
-    let mut columns = vec![Vec::<String>::new(); num_cols];
-    for row in rows {
-        for (col_idx, cell) in row.iter().enumerate() {
-            if col_idx < num_cols && !cell.is_empty() {
-                columns[col_idx].push(cell.clone());
-            }
-        }
+    let range = open_sheet_range(path, sheet_name)?;
+    let header_idx = header_row.unwrap_or(1).saturating_sub(1);
+    let width = range.end().map_or(0, |(_, c)| c as usize + 1);
+    let mut columns: Vec<Vec<String>> = Vec::new();
+    for (_, row) in sheet_rows(&range, header_idx + 1, max_rows) {
+        push_column_samples(&mut columns, width, first_column(&range), row);
     }
     Ok(columns)
 }
 
+/// Add one sample row's non-empty values to `columns` (indexed from column A). The first row sizes `columns`
+/// to `width`; cells past `width` are skipped. `first_col` is the absolute column of `row[0]`.
+fn push_column_samples(columns: &mut Vec<Vec<String>>, width: usize, first_col: usize, row: &[Data]) {
+    if columns.is_empty() {
+        *columns = vec![Vec::new(); width];
+    }
+    for (i, cell) in row.iter().enumerate() {
+        let Some(column) = columns.get_mut(first_col + i) else {
+            break;
+        };
+        // as_string() is None for empty cells, so only non-empty values allocate a String.
+        if let Some(s) = cell.as_string().filter(|s| !s.is_empty()) {
+            column.push(s);
+        }
+    }
+}
+
+/// True if the cell holds a non-blank string or a number (same rule as `as_string()` + trim, without allocating).
+fn cell_has_content(cell: &Data) -> bool {
+    match cell {
+        Data::String(s) => !s.trim().is_empty(),
+        Data::Int(_) | Data::Float(_) => true,
+        _ => false,
+    }
+}
+
 /// Get list of sheet names from workbook.
 pub fn get_sheet_names(path: &str) -> Result<Vec<String>, String> {
     let path = Path::new(path);
     if !path.exists() {
         return Err("File not found.".to_string());
     }
+    if let Some(names) = xlsx_reader::sheet_names(path) {
+        return Ok(names);
+    }
     let workbook = open_workbook_auto(path).map_err(|e| e.to_string())?;
     Ok(workbook.sheet_names().to_vec())
 }
 
+/// Layout dump produced by write_excel_structure. Sheets are keyed in sorted order, like serde_json::Map.
+#[derive(serde::Serialize)]
+struct ExcelStructureDump<'a> {
+    path: Cow<'a, str>,
+    sheet_names: &'a [String],
+    sheets: BTreeMap<&'a str, Vec<Vec<String>>>,
+}
+
 /// Dump Excel structure to JSON (sheet names + first N rows per sheet, cell-by-cell).
 /// Use this to inspect real layout (merged cells show as one cell with content, rest empty).
 pub fn dump_excel_structure(path: &str, max_rows: usize) -> Result<String, String> {
+    let mut out = Vec::new();
+    write_excel_structure(path, max_rows, &mut out)?;
+    String::from_utf8(out).map_err(|e| e.to_string())
+}
+
+/// Same as dump_excel_structure, but serializes pretty JSON straight into `writer`
+/// (no intermediate serde_json::Value tree or output String).
+pub fn write_excel_structure<W: IoWrite>(path: &str, max_rows: usize, writer: W) -> Result<(), String> {
     let path = Path::new(path);
     if !path.exists() {
         return Err("File not found.".to_string());
     }
     let mut workbook = open_workbook_auto(path).map_err(|e| format!("Open failed: {}", e))?;
     let sheet_names = workbook.sheet_names().to_vec();
-    let mut sheets = serde_json::Map::new();
+    let mut sheets = BTreeMap::new();
     for name in &sheet_names {
         let range = workbook
             .worksheet_range(name)
             .map_err(|e| format!("Sheet '{}': {}", name, e))?;
-        let mut rows: Vec<Vec<String>> = Vec::new();
-        for (row_idx, row) in range.rows().enumerate() {
-            if row_idx >= max_rows {
-                break;
-            }
-            let cells: Vec<String> = row
-                .iter()
-                .map(|c| c.as_string().map(String::from).unwrap_or_else(|| format!("{:?}", c)))
-                .collect();
-            rows.push(cells);
-        }
-        let arr: serde_json::Value = serde_json::to_value(rows).map_err(|e| e.to_string())?;
-        sheets.insert(name.clone(), arr);
-    }
-    let out = serde_json::json!({
-        "path": path.to_string_lossy(),
-        "sheet_names": sheet_names,
-        "sheets": sheets,
-    });
-    serde_json::to_string_pretty(&out).map_err(|e| e.to_string())
+        let rows: Vec<Vec<String>> = range
+            .rows()
+            .take(max_rows)
+            .map(|row| {
+                row.iter()
+                    .map(|c| c.as_string().unwrap_or_else(|| format!("{:?}", c)))
+                    .collect()
+            })
+            .collect();
+        sheets.insert(name.as_str(), rows);
+    }
+    let dump = ExcelStructureDump {
+        path: path.to_string_lossy(),
+        sheet_names: &sheet_names,
+        sheets,
+    };
+    serde_json::to_writer_pretty(writer, &dump).map_err(|e| e.to_string())
 }
 
-/// Find the last 1-based row index that contains any data in the sheet, scanning from header_row downward.
+/// Find the last 1-based sheet row that contains any data, scanning from header_row downward.
 /// Stops after 100 consecutive empty rows. Returns header_row (1-based) if sheet is empty or only has header.
 pub fn find_last_data_row(path: &Path, sheet_name: &str, header_row: u32) -> Result<u32, String> {
-    let mut workbook = open_workbook_auto(path).map_err(|e| format!("Could not open Excel file: {}", e))?;
-    let range = workbook
-        .worksheet_range(sheet_name)
-        .map_err(|e| format!("Sheet not found: {}", e))?;
-    let start_row_0 = header_row.saturating_sub(1) as usize; // 1-based -> 0-based
-    let mut last_data_row_0: Option<usize> = None;
+    let range = open_sheet_range(path, sheet_name)?;
+    let start_row_0 = header_row.saturating_sub(1); // 1-based -> 0-based
+    let mut last_data_row_0: Option<u32> = None;
     let mut empty_count = 0u32;
-    for (row_idx, row) in range.rows().enumerate().skip(start_row_0) {
+    for (row_idx, row) in sheet_rows(&range, start_row_0, usize::MAX) {
         let has_data = row.iter().any(|c| !c.is_empty());
         if has_data {
             last_data_row_0 = Some(row_idx);
@@ -189,9 +259,7 @@ pub fn find_last_data_row(path: &Path, sheet_name: &str, header_row: u32) -> Res
             }
         }
     }
-    let one_based = last_data_row_0
-        .map(|r| (r + 1) as u32)
-        .unwrap_or(header_row);
+    let one_based = last_data_row_0.map(|r| r + 1).unwrap_or(header_row);
     Ok(one_based)
 }
 
@@ -224,47 +292,33 @@ fn to_radix36(mut n: u32) -> String {
 const SAMPLE_ROWS: usize = 5;
 const MAX_LAST_ROW_SCAN: usize = 2000;
 
+/// Result of analyze_excel_schema: (worksheet_name, headers, column_samples, last_data_row, schema_hash).
+pub type AnalyzedSchema = (String, Vec<String>, Vec<Vec<String>>, u32, String);
+
 /// Analyze Excel sheet and return schema (headers, samples, last row, hash).
 /// Used by frontend instead of loading full file into webview to avoid OOM.
-pub fn analyze_excel_schema(
-    path_str: &str,
-    sheet_name: &str,
-    header_row: u32,
-) -> Result<(String, Vec<String>, Vec<Vec<String>>, u32, String), String> {
+pub fn analyze_excel_schema(path_str: &str, sheet_name: &str, header_row: u32) -> Result<AnalyzedSchema, String> {
     let path = Path::new(path_str);
     if !path.exists() {
         return Err("File not found. Browse to select again.".to_string());
     }
-    let mut workbook = open_workbook_auto(path).map_err(|e| format!("Could not open Excel file: {}", e))?;
-    let range = workbook
-        .worksheet_range(sheet_name)
-        .map_err(|e| format!("Sheet not found: {}", e))?;
-    let header_idx = header_row.saturating_sub(1) as usize;
-
-    let headers = range
-        .rows()
-        .nth(header_idx)
-        .map(|row| {
-            row.iter()
-                .map(|c| c.as_string().unwrap_or_default())
-                .collect::<Vec<String>>()
-        })
-        .unwrap_or_default();
-    let mut trim = headers.len();
-    while trim > 0 && headers.get(trim - 1).map(|s| s.trim().is_empty()).unwrap_or(true) {
-        trim -= 1;
-    }
-    let headers: Vec<String> = headers.into_iter().take(trim).collect();
-
-    let column_samples = read_excel_column_samples(path_str, sheet_name, Some(header_row), SAMPLE_ROWS)?;
-
-    let mut last_data_row = header_idx as u32 + 1;
-    for (i, row) in range.rows().skip(header_idx + 1).take(MAX_LAST_ROW_SCAN).enumerate() {
-        let has_content = row
-            .iter()
-            .any(|c| !c.as_string().unwrap_or_default().trim().is_empty());
-        if has_content {
-            last_data_row = (header_idx + 2 + i) as u32;
+    let range = open_sheet_range(path, sheet_name)?;
+    let header_idx = header_row.saturating_sub(1);
+    let headers = row_strings(&range, header_idx);
+
+    // Single pass below the header: the first SAMPLE_ROWS rows feed column samples,
+    // every scanned row feeds last_data_row.
+    // Samples are cut to the header width; columns past the last header have no mapping target.
+    let width = headers.len();
+    let first_col = first_column(&range);
+    let mut column_samples: Vec<Vec<String>> = Vec::new();
+    let mut last_data_row = header_idx + 1;
+    for (row_idx, row) in sheet_rows(&range, header_idx + 1, MAX_LAST_ROW_SCAN) {
+        if ((row_idx - header_idx - 1) as usize) < SAMPLE_ROWS {
+            push_column_samples(&mut column_samples, width, first_col, row);
+        }
+        if row.iter().any(cell_has_content) {
+            last_data_row = row_idx + 1;
         }
     }
 
@@ -273,6 +327,11 @@ pub fn analyze_excel_schema(
     Ok((worksheet_name, headers, column_samples, last_data_row, hash))
 }
 
+// Patterns for strip_drawings_from_xlsx, compiled on first use instead of on every export.
+static REL_DRAWING_RE: std::sync::OnceLock<Regex> = std::sync::OnceLock::new();
+static CT_DRAWING_RE: std::sync::OnceLock<Regex> = std::sync::OnceLock::new();
+static CT_MEDIA_RE: std::sync::OnceLock<Regex> = std::sync::OnceLock::new();
+
 /// Strip drawing and image parts from an xlsx (zip) file so Excel won't
 /// show "Repairs to ... Removed Part: Drawing shape" when opening.
 /// We do NOT modify worksheet XML (sheet1.xml etc.) to avoid corrupting cell data.
@@ -287,9 +346,13 @@ fn strip_drawings_from_xlsx(path: &Path) -> Result<(), String> {
     let mut zip_writer = ZipWriter::new(out_file);
     let opts = SimpleFileOptions::default().compression_method(zip::CompressionMethod::Deflated);
 
-    let rel_drawing_re = Regex::new(r#"<Relationship[^>]*drawing[^>]*/>"#).expect("rel drawing regex");
-    let ct_drawing_re = Regex::new(r#"<Override\s+PartName="/xl/drawings/[^"]*"[^>]*/>"#).expect("ct drawing regex");
-    let ct_media_re = Regex::new(r#"<Override\s+PartName="/xl/media/[^"]*"[^>]*/>"#).expect("ct media regex");
+    let rel_drawing_re = REL_DRAWING_RE
+        .get_or_init(|| Regex::new(r#"<Relationship[^>]*drawing[^>]*/>"#).expect("rel drawing regex"));
+    let ct_drawing_re = CT_DRAWING_RE.get_or_init(|| {
+        Regex::new(r#"<Override\s+PartName="/xl/drawings/[^"]*"[^>]*/>"#).expect("ct drawing regex")
+    });
+    let ct_media_re = CT_MEDIA_RE
+        .get_or_init(|| Regex::new(r#"<Override\s+PartName="/xl/media/[^"]*"[^>]*/>"#).expect("ct media regex"));
 
     for i in 0..archive.len() {
         let mut entry = archive.by_index(i).map_err(|e| format!("Entry {}: {}", i, e))?;
@@ -1833,3 +1896,33 @@ pub fn create_plata_template_xlsx(path: &str) -> Result<(), String> {
     workbook.save(path).map_err(|e: XlsxError| e.to_string())?;
     Ok(())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use calamine::Cell;
+
+    #[test]
+    fn calamine_rows_use_sheet_coordinates() {
+        // Used range starts at C2: empty first row and two empty leading columns, as in some templates.
+        let range = Range::from_sparse(vec![
+            Cell::new((1, 2), Data::String("Број".to_string())),
+            Cell::new((1, 3), Data::String("Датум".to_string())),
+            Cell::new((2, 2), Data::Float(7.0)),
+            Cell::new((3, 5), Data::String(" ".to_string())),
+        ]);
+        assert_eq!(row_strings(&range, 1), vec!["", "", "Број", "Датум"]);
+        assert_eq!(row_strings(&range, 0), Vec::<String>::new());
+        assert_eq!(row_strings(&range, 3), Vec::<String>::new());
+
+        let rows: Vec<u32> = sheet_rows(&range, 2, 5).map(|(r, _)| r).collect();
+        assert_eq!(rows, vec![2, 3]);
+        assert_eq!(sheet_rows(&range, 1, usize::MAX).count(), 3);
+
+        let mut columns = Vec::new();
+        for (_, row) in sheet_rows(&range, 2, 5) {
+            push_column_samples(&mut columns, 4, first_column(&range), row);
+        }
+        assert_eq!(columns, vec![vec![], vec![], vec!["7".to_string()], vec![]]);
+    }
+}
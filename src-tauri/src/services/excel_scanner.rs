@@ -1,7 +1,9 @@
 //! Excel structure and format scanning using edit-xlsx (1-based row/col).
 
+use crate::excel::col_index_to_letter;
 use crate::models::{ColumnFormat, HeaderInfo, RowTemplate};
-use edit_xlsx::Read;
+use crate::services::xlsx_reader;
+use edit_xlsx::{Read, WorkSheet};
 use std::path::Path;
 
 const HEADER_KEYWORDS: &[&str] = &[
@@ -9,67 +11,37 @@ const HEADER_KEYWORDS: &[&str] = &[
     "износ", "amount", "тип", "type", "опис", "description", "ддв", "vat", "tax",
 ];
 
-/// Column index (0-based) to Excel letter (0→A, 1→B, 26→AA).
-fn column_index_to_letter(index: u16) -> String {
-    let mut n = index as u32;
-    let mut s = String::new();
-    loop {
-        let r = (n % 26) as u8;
-        s.insert(0, (b'A' + r) as char);
-        if n < 26 {
-            break;
-        }
-        n = n / 26 - 1;
-    }
-    s
+/// Text of the cell at 1-based (row, col); None for empty or missing cells.
+fn cell_text(sheet: &WorkSheet, row: u32, col: u32) -> Option<String> {
+    sheet.read_cell((row, col)).ok().and_then(|c| c.text)
 }
 
-/// Detect header row by scanning rows 1..=20 for keyword matches (edit-xlsx uses 1-based rows).
-pub fn detect_header_row(workbook: &edit_xlsx::Workbook, sheet_name: &str) -> Result<u32, String> {
-    let sheet = workbook
-        .get_worksheet_by_name(sheet_name)
-        .map_err(|e| format!("Worksheet '{}' not found: {}", sheet_name, e))?;
-    for row in 1..=20u32 {
+/// Detect header row by scanning rows 1..=20 (bounded by the sheet's last row) for keyword matches.
+pub fn detect_header_row(sheet: &WorkSheet) -> Result<u32, String> {
+    for row in 1..=20u32.min(sheet.max_row()) {
         let mut keyword_count = 0u32;
         for col in 1..=20u32 {
-            if let Ok(cell) = sheet.read_cell((row, col)) {
-                let value = cell
-                    .text
-                    .as_deref()
-                    .unwrap_or("")
-                    .to_lowercase();
-                for keyword in HEADER_KEYWORDS {
-                    if value.contains(keyword) {
-                        keyword_count += 1;
-                        break;
+            if let Some(text) = cell_text(sheet, row, col) {
+                let value = text.to_lowercase();
+                if HEADER_KEYWORDS.iter().any(|keyword| value.contains(keyword)) {
+                    keyword_count += 1;
+                    // Three keyword cells decide it; the rest of the row and later rows are not needed.
+                    if keyword_count >= 3 {
+                        return Ok(row);
                     }
                 }
             }
         }
-        if keyword_count >= 3 {
-            return Ok(row);
-        }
     }
     Ok(1)
 }
 
 /// Extract headers from the given header row (1-based). Stops after 3 consecutive empty cells.
-pub fn extract_headers(
-    workbook: &edit_xlsx::Workbook,
-    sheet_name: &str,
-    header_row: u32,
-) -> Result<Vec<HeaderInfo>, String> {
-    let sheet = workbook
-        .get_worksheet_by_name(sheet_name)
-        .map_err(|e| format!("Worksheet not found: {}", e))?;
+pub fn extract_headers(sheet: &WorkSheet, header_row: u32) -> Result<Vec<HeaderInfo>, String> {
     let mut headers = Vec::new();
     let mut empty_count = 0u32;
     for col in 1..=50u32 {
-        let text = sheet
-            .read_cell((header_row, col))
-            .ok()
-            .and_then(|c| c.text)
-            .unwrap_or_default();
+        let text = cell_text(sheet, header_row, col).unwrap_or_default();
         let text = text.trim().to_string();
         if text.is_empty() {
             empty_count += 1;
@@ -81,7 +53,7 @@ pub fn extract_headers(
             let col_index = (col - 1) as u16;
             headers.push(HeaderInfo {
                 column_index: col_index,
-                column_letter: column_index_to_letter(col_index),
+                column_letter: col_index_to_letter(col_index as u32).into_owned(),
                 text,
             });
         }
@@ -89,33 +61,24 @@ pub fn extract_headers(
     Ok(headers)
 }
 
-/// Find last row that has data in the first 20 columns. Stops after 100 consecutive empty rows.
-pub fn find_last_data_row(
-    workbook: &edit_xlsx::Workbook,
-    sheet_name: &str,
-    header_row: u32,
-) -> Result<u32, String> {
-    let sheet = workbook
-        .get_worksheet_by_name(sheet_name)
-        .map_err(|e| format!("Worksheet not found: {}", e))?;
+/// Find last row that has data in the first 20 columns. Stops after 100 consecutive empty rows
+/// or at the sheet's last row, whichever comes first.
+pub fn find_last_data_row(sheet: &WorkSheet, header_row: u32) -> Result<u32, String> {
     let start_row = header_row + 1;
-    let max_scan = start_row + 10_000;
+    let max_scan = (start_row + 10_000).min(sheet.max_row());
     let mut last_row = header_row;
     let mut consecutive_empty = 0u32;
     for row in start_row..=max_scan {
-        let mut has_data = false;
+        let mut row_has_data = false;
         for col in 1..=20u32 {
-            if let Ok(cell) = sheet.read_cell((row, col)) {
-                let s = cell.text.as_deref().unwrap_or("").trim();
-                if !s.is_empty() {
-                    has_data = true;
-                    last_row = row;
-                    consecutive_empty = 0;
-                    break;
-                }
+            if cell_text(sheet, row, col).map_or(false, |s| !s.trim().is_empty()) {
+                row_has_data = true;
+                last_row = row;
+                consecutive_empty = 0;
+                break;
             }
         }
-        if !has_data {
+        if !row_has_data {
             consecutive_empty += 1;
             if consecutive_empty >= 100 {
                 break;
@@ -137,16 +100,14 @@ fn format_color_to_hex(color: &edit_xlsx::FormatColor) -> String {
     }
 }
 
-/// Extract ColumnFormat from a data row cell (1-based row/col).
+/// Extract ColumnFormat from a data row cell (1-based row/col). `max_row` is the sheet's max_row(), computed once by the caller.
 fn cell_to_column_format(
-    workbook: &edit_xlsx::Workbook,
-    sheet_name: &str,
+    sheet: &WorkSheet,
     header: &HeaderInfo,
     template_row: u32,
+    max_row: u32,
+    is_date: bool,
 ) -> Result<ColumnFormat, String> {
-    let sheet = workbook
-        .get_worksheet_by_name(sheet_name)
-        .map_err(|e| format!("Worksheet not found: {}", e))?;
     let col_1based = header.column_index + 1;
     let cell = sheet
         .read_cell((template_row, col_1based as u32))
@@ -178,7 +139,7 @@ fn cell_to_column_format(
                 None,
             )
         };
-    let alt_bg = if template_row + 1 <= sheet.max_row() {
+    let alt_bg = if template_row + 1 <= max_row {
         if let Ok(next_cell) = sheet.read_cell((template_row + 1, col_1based as u32)) {
             if let Some(ref next_fmt) = next_cell.format {
                 let next_bg = format_color_to_hex(next_fmt.get_background_color());
@@ -196,8 +157,7 @@ fn cell_to_column_format(
     } else {
         None
     };
-    let cell_text = cell.text.as_deref().unwrap_or("");
-    let data_type = detect_data_type(cell_text);
+    let data_type = cell_data_type(cell.text.as_deref().unwrap_or(""), is_date);
     let column_width = 10.0;
     Ok(ColumnFormat {
         column_index: header.column_index,
@@ -219,6 +179,16 @@ fn cell_to_column_format(
     })
 }
 
+/// Data type of the template cell. Date cells hold a serial number, so their number format decides;
+/// everything else goes through the text heuristics below.
+fn cell_data_type(text: &str, is_date: bool) -> String {
+    if is_date {
+        "date".to_string()
+    } else {
+        detect_data_type(text)
+    }
+}
+
 fn detect_data_type(value: &str) -> String {
     let v = value.trim();
     if v.is_empty() {
@@ -227,7 +197,7 @@ fn detect_data_type(value: &str) -> String {
     if v.parse::<f64>().is_ok() {
         return "number".to_string();
     }
-    if v.contains('.') && v.replace(',', "").chars().all(|c| c.is_numeric() || c == '.') {
+    if v.contains('.') && v.chars().all(|c| c.is_numeric() || c == '.' || c == ',') {
         return "number".to_string();
     }
     if v.contains('/') || v.contains('-') {
@@ -239,15 +209,18 @@ fn detect_data_type(value: &str) -> String {
 }
 
 /// Analyze column formats from the first data row (template row).
+/// `date_columns` are the 0-based columns whose template cell has a date number format.
 pub fn analyze_column_formats(
-    workbook: &edit_xlsx::Workbook,
-    sheet_name: &str,
+    sheet: &WorkSheet,
     headers: &[HeaderInfo],
     template_row: u32,
+    max_row: u32,
+    date_columns: &[usize],
 ) -> Result<Vec<ColumnFormat>, String> {
     let mut columns = Vec::new();
     for header in headers {
-        columns.push(cell_to_column_format(workbook, sheet_name, header, template_row)?);
+        let is_date = date_columns.contains(&(header.column_index as usize));
+        columns.push(cell_to_column_format(sheet, header, template_row, max_row, is_date)?);
     }
     Ok(columns)
 }
@@ -273,18 +246,22 @@ pub fn scan_excel_file(
     let mut workbook =
         edit_xlsx::Workbook::from_path(path).map_err(|e| format!("Could not open Excel file: {}", e))?;
     workbook.finish();
-    let header_row = detect_header_row(&workbook, sheet_name)?;
-    let headers = extract_headers(&workbook, sheet_name, header_row)?;
+    // Resolve the worksheet once; every helper below reads from the same sheet.
+    let sheet = workbook
+        .get_worksheet_by_name(sheet_name)
+        .map_err(|e| format!("Worksheet '{}' not found: {}", sheet_name, e))?;
+    let header_row = detect_header_row(sheet)?;
+    let headers = extract_headers(sheet, header_row)?;
     if headers.is_empty() {
         return Err("No headers found".to_string());
     }
-    let last_data_row = find_last_data_row(&workbook, sheet_name, header_row)?;
+    let last_data_row = find_last_data_row(sheet, header_row)?;
     let next_free_row = last_data_row + 1;
     let template_row = header_row + 1;
-    let columns = analyze_column_formats(&workbook, sheet_name, &headers, template_row)?;
-    let sheet = workbook
-        .get_worksheet_by_name(sheet_name)
-        .map_err(|e| format!("Worksheet not found: {}", e))?;
+    let total_rows = sheet.max_row();
+    // edit-xlsx does not expose number formats; read the template row's date styles from the package.
+    let date_columns = xlsx_reader::date_columns(path, sheet_name, template_row).unwrap_or_default();
+    let columns = analyze_column_formats(sheet, &headers, template_row, total_rows, &date_columns)?;
     let row_height = sheet.get_default_row();
     let use_alternating_colors = columns.iter().any(|c| c.background_color_alt.is_some());
     let row_template = RowTemplate {
@@ -292,7 +269,6 @@ pub fn scan_excel_file(
         row_height,
         use_alternating_colors,
     };
-    let total_rows = sheet.max_row();
     let metadata = std::fs::metadata(path).map_err(|e| format!("Failed to read file metadata: {}", e))?;
     let file_size = metadata.len();
     let file_mtime = metadata
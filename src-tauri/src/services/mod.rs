@@ -1 +1,2 @@
 pub mod excel_scanner;
+pub mod xlsx_reader;
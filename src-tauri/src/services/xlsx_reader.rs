@@ -0,0 +1,530 @@
+//! Streaming reads of a few cells from .xlsx packages without loading the whole sheet.
+//! calamine's worksheet_range parses every row; for a header near the top of a large sheet
+//! it is much cheaper to stream the sheet XML and stop as soon as the row has been read.
+//! Every function returns None when the package layout is unexpected so callers can fall back to calamine.
+
+use quick_xml::events::{BytesStart, Event};
+use quick_xml::Reader as XmlReader;
+use std::fs::File;
+use std::io::{BufRead, BufReader, Read, Seek};
+use std::path::Path;
+use zip::read::ZipArchive;
+
+/// Raw value of one cell in the target row, before shared strings are resolved.
+enum RawCell {
+    Shared(usize),
+    Text(String),
+    /// Number with a non-default style (index into cellXfs); it may be a date, depending on the style's number format.
+    StyledNumber(usize),
+}
+
+/// Read one sheet row (1-based, as shown in Excel) of `sheet_name` as display strings, in column order
+/// starting at column A, without trailing empty cells.
+/// Values follow calamine's `as_string()`: text and numbers are kept, booleans/errors/dates are empty.
+/// Returns None for non-xlsx files, missing parts, or numeric cells with a style (possibly dates).
+pub fn read_row(path: &Path, sheet_name: &str, row_1based: u32) -> Option<Vec<String>> {
+    let file = File::open(path).ok()?;
+    let mut archive = ZipArchive::new(file).ok()?;
+    let sheet_part = sheet_part_path(&mut archive, sheet_name)?;
+    let cells = {
+        let entry = archive.by_name(&sheet_part).ok()?;
+        read_sheet_row(BufReader::new(entry), row_1based)?
+    };
+    // A styled number may be a date; leave those rows to calamine, which applies number formats.
+    if cells.iter().any(|(_, c)| matches!(c, RawCell::StyledNumber(_))) {
+        return None;
+    }
+
+    // Shared strings are only parsed up to the highest index this row references.
+    let needed = cells
+        .iter()
+        .filter_map(|(_, c)| match c {
+            RawCell::Shared(i) => Some(i + 1),
+            _ => None,
+        })
+        .max();
+    let shared = match needed {
+        Some(count) => {
+            let entry = archive.by_name("xl/sharedStrings.xml").ok()?;
+            read_shared_strings(BufReader::new(entry), count)?
+        }
+        None => Vec::new(),
+    };
+    build_row(cells, &shared)
+}
+
+/// 0-based columns of one sheet row (1-based) whose cell is a number shown with a date or time format.
+/// Reads the sheet only up to that row, plus xl/styles.xml when the row has styled numbers.
+/// Returns None for non-xlsx files or an unexpected package layout.
+pub fn date_columns(path: &Path, sheet_name: &str, row_1based: u32) -> Option<Vec<usize>> {
+    let file = File::open(path).ok()?;
+    let mut archive = ZipArchive::new(file).ok()?;
+    let sheet_part = sheet_part_path(&mut archive, sheet_name)?;
+    let cells = {
+        let entry = archive.by_name(&sheet_part).ok()?;
+        read_sheet_row(BufReader::new(entry), row_1based)?
+    };
+    let styled: Vec<(usize, usize)> = cells
+        .iter()
+        .filter_map(|(col, c)| match c {
+            RawCell::StyledNumber(style) => Some((*col, *style)),
+            _ => None,
+        })
+        .collect();
+    if styled.is_empty() {
+        return Some(Vec::new());
+    }
+    let date_styles = {
+        let entry = archive.by_name("xl/styles.xml").ok()?;
+        read_date_styles(BufReader::new(entry))?
+    };
+    Some(
+        styled
+            .into_iter()
+            .filter(|(_, style)| date_styles.get(*style).copied().unwrap_or(false))
+            .map(|(col, _)| col)
+            .collect(),
+    )
+}
+
+/// Lay out the row's cells from column A, resolve shared strings and drop trailing empty cells
+/// (calamine-based readers trim the same way, so both paths return the same vector).
+fn build_row(cells: Vec<(usize, RawCell)>, shared: &[String]) -> Option<Vec<String>> {
+    let width = cells.iter().map(|(col, _)| col + 1).max().unwrap_or(0);
+    let mut row = vec![String::new(); width];
+    for (col, cell) in cells {
+        row[col] = match cell {
+            RawCell::Shared(i) => shared.get(i)?.clone(),
+            RawCell::Text(s) => s,
+            RawCell::StyledNumber(_) => return None,
+        };
+    }
+    while row.last().map_or(false, |s| s.trim().is_empty()) {
+        row.pop();
+    }
+    Some(row)
+}
+
+/// Sheet names in workbook order, read from xl/workbook.xml alone (shared strings and styles are not parsed).
+pub fn sheet_names(path: &Path) -> Option<Vec<String>> {
+    let file = File::open(path).ok()?;
+    let mut archive = ZipArchive::new(file).ok()?;
+    let entry = archive.by_name("xl/workbook.xml").ok()?;
+    let mut reader = XmlReader::from_reader(BufReader::new(entry));
+    let mut buf = Vec::new();
+    let mut names = Vec::new();
+    loop {
+        match reader.read_event_into(&mut buf).ok()? {
+            Event::Start(e) | Event::Empty(e) if e.local_name().as_ref() == b"sheet" => {
+                names.push(attr_value(&e, b"name")?);
+            }
+            Event::End(e) if e.local_name().as_ref() == b"sheets" => break,
+            Event::Eof => break,
+            _ => {}
+        }
+        buf.clear();
+    }
+    if names.is_empty() {
+        None
+    } else {
+        Some(names)
+    }
+}
+
+/// Resolve a sheet name to its part path inside the package (e.g. "xl/worksheets/sheet1.xml").
+fn sheet_part_path<R: Read + Seek>(archive: &mut ZipArchive<R>, sheet_name: &str) -> Option<String> {
+    let rel_id = {
+        let entry = archive.by_name("xl/workbook.xml").ok()?;
+        find_sheet_rel_id(BufReader::new(entry), sheet_name)?
+    };
+    let entry = archive.by_name("xl/_rels/workbook.xml.rels").ok()?;
+    let target = find_relationship_target(BufReader::new(entry), &rel_id)?;
+    Some(match target.strip_prefix('/') {
+        Some(absolute) => absolute.to_string(),
+        None => format!("xl/{}", target),
+    })
+}
+
+/// Attribute value by local name (ignores namespace prefixes such as `r:id`).
+fn attr_value(e: &BytesStart, name: &[u8]) -> Option<String> {
+    e.attributes()
+        .flatten()
+        .find(|a| a.key.local_name().as_ref() == name)
+        .and_then(|a| a.unescape_value().ok().map(|v| v.into_owned()))
+}
+
+/// Relationship id (`r:id`) of the `<sheet>` named `sheet_name` in workbook.xml.
+fn find_sheet_rel_id<R: BufRead>(xml: R, sheet_name: &str) -> Option<String> {
+    let mut reader = XmlReader::from_reader(xml);
+    let mut buf = Vec::new();
+    loop {
+        match reader.read_event_into(&mut buf).ok()? {
+            Event::Start(e) | Event::Empty(e) if e.local_name().as_ref() == b"sheet" => {
+                if attr_value(&e, b"name").as_deref() == Some(sheet_name) {
+                    return attr_value(&e, b"id");
+                }
+            }
+            Event::Eof => return None,
+            _ => {}
+        }
+        buf.clear();
+    }
+}
+
+/// `Target` of the relationship with the given `Id` in workbook.xml.rels.
+fn find_relationship_target<R: BufRead>(xml: R, rel_id: &str) -> Option<String> {
+    let mut reader = XmlReader::from_reader(xml);
+    let mut buf = Vec::new();
+    loop {
+        match reader.read_event_into(&mut buf).ok()? {
+            Event::Start(e) | Event::Empty(e) if e.local_name().as_ref() == b"Relationship" => {
+                if attr_value(&e, b"Id").as_deref() == Some(rel_id) {
+                    return attr_value(&e, b"Target");
+                }
+            }
+            Event::Eof => return None,
+            _ => {}
+        }
+        buf.clear();
+    }
+}
+
+/// 0-based column of a cell reference ("A1" → 0, "AB12" → 27).
+fn cell_ref_column(cell_ref: &str) -> Option<usize> {
+    let mut col = 0usize;
+    let mut letters = 0;
+    for b in cell_ref.bytes().take_while(|b| b.is_ascii_alphabetic()) {
+        col = col * 26 + (b.to_ascii_uppercase() - b'A') as usize + 1;
+        letters += 1;
+    }
+    if letters == 0 {
+        None
+    } else {
+        Some(col - 1)
+    }
+}
+
+/// Decode Excel's `_xHHHH_` escapes (e.g. `_x000D_` for a carriage return) in string values.
+fn decode_excel_escapes(s: &str) -> String {
+    if !s.contains("_x") {
+        return s.to_string();
+    }
+    let mut out = String::with_capacity(s.len());
+    let mut rest = s;
+    while let Some(pos) = rest.find("_x") {
+        out.push_str(&rest[..pos]);
+        let tail = &rest[pos..];
+        let decoded = tail
+            .get(2..6)
+            .filter(|_| tail.as_bytes().get(6) == Some(&b'_'))
+            .and_then(|hex| u32::from_str_radix(hex, 16).ok())
+            .and_then(char::from_u32);
+        match decoded {
+            Some(c) => {
+                out.push(c);
+                rest = &tail[7..];
+            }
+            None => {
+                out.push_str("_x");
+                rest = &tail[2..];
+            }
+        }
+    }
+    out.push_str(rest);
+    out
+}
+
+/// Stream the sheet XML up to the end of the target row.
+/// Returns the row's non-empty cells as (0-based column, value); empty if the row is not in the sheet.
+fn read_sheet_row<R: BufRead>(xml: R, row_1based: u32) -> Option<Vec<(usize, RawCell)>> {
+    let mut reader = XmlReader::from_reader(xml);
+    let mut buf = Vec::new();
+    let mut cells = Vec::new();
+    let mut current_row = 0u32;
+    let mut next_col = 0usize;
+    let mut col = 0usize;
+    let mut cell_type = String::new();
+    let mut style = 0usize;
+    let mut value = String::new();
+    let mut in_value = false;
+    let mut in_phonetic = false;
+    loop {
+        match reader.read_event_into(&mut buf).ok()? {
+            Event::Start(e) | Event::Empty(e) if e.local_name().as_ref() == b"row" => {
+                current_row = attr_value(&e, b"r")
+                    .and_then(|r| r.parse().ok())
+                    .unwrap_or(current_row + 1);
+                next_col = 0;
+                if current_row > row_1based {
+                    break;
+                }
+            }
+            Event::End(e) if e.local_name().as_ref() == b"row" && current_row == row_1based => break,
+            Event::End(e) if e.local_name().as_ref() == b"sheetData" => break,
+            Event::Start(e) | Event::Empty(e)
+                if current_row == row_1based && e.local_name().as_ref() == b"c" =>
+            {
+                col = attr_value(&e, b"r")
+                    .and_then(|r| cell_ref_column(&r))
+                    .unwrap_or(next_col);
+                next_col = col + 1;
+                cell_type = attr_value(&e, b"t").unwrap_or_default();
+                style = attr_value(&e, b"s").and_then(|s| s.parse().ok()).unwrap_or(0);
+                value.clear();
+            }
+            Event::Start(e) if current_row == row_1based => match e.local_name().as_ref() {
+                b"v" | b"t" if !in_phonetic => in_value = true,
+                b"rPh" => in_phonetic = true,
+                _ => {}
+            },
+            Event::Text(t) if in_value => value.push_str(&t.unescape().ok()?),
+            Event::End(e) if current_row == row_1based => match e.local_name().as_ref() {
+                b"v" | b"t" => in_value = false,
+                b"rPh" => in_phonetic = false,
+                b"c" => {
+                    let cell = match cell_type.as_str() {
+                        "s" => Some(RawCell::Shared(value.trim().parse().ok()?)),
+                        "inlineStr" | "str" => Some(RawCell::Text(decode_excel_escapes(&value))),
+                        "n" | "" if value.is_empty() => None,
+                        "n" | "" if style != 0 => Some(RawCell::StyledNumber(style)),
+                        "n" | "" => Some(RawCell::Text(value.trim().parse::<f64>().ok()?.to_string())),
+                        _ => None,
+                    };
+                    if let Some(cell) = cell {
+                        cells.push((col, cell));
+                    }
+                }
+                _ => {}
+            },
+            Event::Eof => break,
+            _ => {}
+        }
+        buf.clear();
+    }
+    Some(cells)
+}
+
+/// Parse the first `count` entries of sharedStrings.xml, then stop.
+fn read_shared_strings<R: BufRead>(xml: R, count: usize) -> Option<Vec<String>> {
+    let mut reader = XmlReader::from_reader(xml);
+    let mut buf = Vec::new();
+    let mut strings = Vec::with_capacity(count);
+    let mut current = String::new();
+    let mut in_text = false;
+    let mut in_phonetic = false;
+    while strings.len() < count {
+        match reader.read_event_into(&mut buf).ok()? {
+            Event::Start(e) => match e.local_name().as_ref() {
+                b"si" => current.clear(),
+                b"t" if !in_phonetic => in_text = true,
+                b"rPh" => in_phonetic = true,
+                _ => {}
+            },
+            Event::Empty(e) if e.local_name().as_ref() == b"si" => strings.push(String::new()),
+            Event::Text(t) if in_text => current.push_str(&t.unescape().ok()?),
+            Event::End(e) => match e.local_name().as_ref() {
+                b"t" => in_text = false,
+                b"rPh" => in_phonetic = false,
+                b"si" => strings.push(decode_excel_escapes(&current)),
+                _ => {}
+            },
+            Event::Eof => break,
+            _ => {}
+        }
+        buf.clear();
+    }
+    Some(strings)
+}
+
+/// Built-in number format ids that display dates or times (same ranges calamine treats as dates).
+fn is_builtin_date_format(id: u32) -> bool {
+    matches!(id, 14..=22 | 27..=36 | 45..=47 | 50..=58 | 71..=81)
+}
+
+/// True if a custom format code shows a date or time: a d/m/y/h/s token outside quoted text,
+/// [bracketed] sections (colours, locales) and escaped characters.
+fn is_date_format_code(code: &str) -> bool {
+    let mut chars = code.chars();
+    while let Some(c) = chars.next() {
+        match c {
+            '"' => {
+                for q in chars.by_ref() {
+                    if q == '"' {
+                        break;
+                    }
+                }
+            }
+            '[' => {
+                for b in chars.by_ref() {
+                    if b == ']' {
+                        break;
+                    }
+                }
+            }
+            '\\' | '_' | '*' => {
+                chars.next();
+            }
+            'd' | 'D' | 'm' | 'M' | 'y' | 'Y' | 'h' | 'H' | 's' | 'S' => return true,
+            _ => {}
+        }
+    }
+    false
+}
+
+/// For each cell style (cellXfs index) in styles.xml, whether its number format is a date or time.
+fn read_date_styles<R: BufRead>(xml: R) -> Option<Vec<bool>> {
+    let mut reader = XmlReader::from_reader(xml);
+    let mut buf = Vec::new();
+    let mut custom_dates: Vec<u32> = Vec::new();
+    let mut styles = Vec::new();
+    let mut in_cell_xfs = false;
+    loop {
+        match reader.read_event_into(&mut buf).ok()? {
+            Event::Start(e) | Event::Empty(e) => match e.local_name().as_ref() {
+                b"numFmt" => {
+                    let id = attr_value(&e, b"numFmtId").and_then(|v| v.parse().ok());
+                    let code = attr_value(&e, b"formatCode").unwrap_or_default();
+                    if let Some(id) = id.filter(|_| is_date_format_code(&code)) {
+                        custom_dates.push(id);
+                    }
+                }
+                b"cellXfs" => in_cell_xfs = true,
+                b"xf" if in_cell_xfs => {
+                    let id: u32 = attr_value(&e, b"numFmtId").and_then(|v| v.parse().ok()).unwrap_or(0);
+                    styles.push(is_builtin_date_format(id) || custom_dates.contains(&id));
+                }
+                _ => {}
+            },
+            Event::End(e) if e.local_name().as_ref() == b"cellXfs" => break,
+            Event::Eof => break,
+            _ => {}
+        }
+        buf.clear();
+    }
+    Some(styles)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// Cells of `row` as (column, value), with shared strings shown as "#index".
+    fn row_cells(xml: &str, row: u32) -> Option<Vec<(usize, String)>> {
+        let cells = read_sheet_row(xml.as_bytes(), row)?;
+        Some(
+            cells
+                .into_iter()
+                .map(|(col, cell)| match cell {
+                    RawCell::Shared(i) => (col, format!("#{}", i)),
+                    RawCell::Text(s) => (col, s),
+                    RawCell::StyledNumber(style) => (col, format!("style {}", style)),
+                })
+                .collect(),
+        )
+    }
+
+    const SHEET: &str = r#"<worksheet><dimension ref="A1:XEO58"/><sheetData>
+        <row r="1"><c r="A1" t="s"><v>0</v></c></row>
+        <row r="3"><c r="C3" t="s"><v>1</v></c><c r="D3"><v>42</v></c><c r="E3" t="inlineStr"><is><t>Line_x000D_</t></is></c>
+            <c r="F3" t="b"><v>1</v></c><c r="G3" s="4"/><c r="XEO3" s="2"/></row>
+        <row r="4"><c r="A4" s="5"><v>45000</v></c></row>
+    </sheetData></worksheet>"#;
+
+    #[test]
+    fn reads_target_row_by_sheet_row_number() {
+        let cells = row_cells(SHEET, 3).unwrap();
+        assert_eq!(
+            cells,
+            vec![(2, "#1".to_string()), (3, "42".to_string()), (4, "Line\r".to_string())]
+        );
+    }
+
+    #[test]
+    fn missing_row_has_no_cells() {
+        assert_eq!(row_cells(SHEET, 2).unwrap(), Vec::new());
+        assert_eq!(row_cells(SHEET, 100).unwrap(), Vec::new());
+    }
+
+    #[test]
+    fn styled_number_is_left_to_calamine() {
+        assert_eq!(row_cells(SHEET, 4).unwrap(), vec![(0, "style 5".to_string())]);
+        let cells = read_sheet_row(SHEET.as_bytes(), 4).unwrap();
+        assert!(build_row(cells, &[]).is_none());
+    }
+
+    #[test]
+    fn date_styles_follow_number_formats() {
+        let xml = r##"<styleSheet><numFmts count="2"><numFmt numFmtId="164" formatCode="dd.mm.yyyy"/><numFmt numFmtId="165" formatCode="#,##0.00&quot; ден&quot;"/></numFmts>
+            <cellStyleXfs count="1"><xf numFmtId="14"/></cellStyleXfs>
+            <cellXfs count="5"><xf numFmtId="0"/><xf numFmtId="14"/><xf numFmtId="164"><alignment/></xf><xf numFmtId="165"/><xf numFmtId="4"/></cellXfs></styleSheet>"##;
+        assert_eq!(read_date_styles(xml.as_bytes()).unwrap(), vec![false, true, true, false, false]);
+    }
+
+    #[test]
+    fn date_format_codes() {
+        assert!(is_date_format_code("dd.mm.yyyy"));
+        assert!(is_date_format_code("[$-42F]d mmmm yyyy"));
+        assert!(is_date_format_code("h:mm:ss"));
+        assert!(!is_date_format_code("#,##0.00\" ден\""));
+        assert!(!is_date_format_code("[Red]0.00"));
+        assert!(!is_date_format_code("0.00\\s"));
+        assert!(!is_date_format_code("General"));
+    }
+
+    #[test]
+    fn cells_without_reference_follow_previous_column() {
+        let xml = r#"<worksheet><sheetData><row><c t="inlineStr"><is><t>a</t></is></c><c r="C1"><v>1.5</v></c><c><v>2</v></c></row></sheetData></worksheet>"#;
+        assert_eq!(
+            row_cells(xml, 1).unwrap(),
+            vec![(0, "a".to_string()), (2, "1.5".to_string()), (3, "2".to_string())]
+        );
+    }
+
+    #[test]
+    fn row_width_ignores_dimension_and_trailing_blanks() {
+        let cells = vec![
+            (1, RawCell::Shared(0)),
+            (3, RawCell::Text("x".to_string())),
+            (7, RawCell::Text("  ".to_string())),
+        ];
+        let row = build_row(cells, &["h".to_string()]).unwrap();
+        assert_eq!(row, vec!["", "h", "", "x"]);
+        assert_eq!(build_row(Vec::new(), &[]).unwrap(), Vec::<String>::new());
+        assert!(build_row(vec![(0, RawCell::Shared(3))], &[]).is_none());
+    }
+
+    #[test]
+    fn shared_strings_join_runs_skip_phonetics_and_stop_at_count() {
+        let xml = r#"<sst><si><t>Број</t></si><si><r><t>Да</t></r><r><t>тум</t></r><rPh><t>x</t></rPh></si><si/><si><t>never read</t></si></sst>"#;
+        assert_eq!(read_shared_strings(xml.as_bytes(), 3).unwrap(), vec!["Број", "Датум", ""]);
+        assert_eq!(read_shared_strings(xml.as_bytes(), 1).unwrap(), vec!["Број"]);
+    }
+
+    #[test]
+    fn decodes_excel_escapes() {
+        assert_eq!(decode_excel_escapes("a_x000D_b"), "a\rb");
+        assert_eq!(decode_excel_escapes("_x0041__x0042_"), "AB");
+        assert_eq!(decode_excel_escapes("no_xescape_x12"), "no_xescape_x12");
+        assert_eq!(decode_excel_escapes("plain"), "plain");
+    }
+
+    #[test]
+    fn column_from_cell_reference() {
+        assert_eq!(cell_ref_column("A1"), Some(0));
+        assert_eq!(cell_ref_column("Z9"), Some(25));
+        assert_eq!(cell_ref_column("AB12"), Some(27));
+        assert_eq!(cell_ref_column("12"), None);
+    }
+
+    #[test]
+    fn resolves_sheet_relationship() {
+        let workbook = r#"<workbook xmlns:r="r"><sheets><sheet name="A &amp; B" sheetId="1" r:id="rId3"/><sheet name="Sheet1" sheetId="2" r:id="rId1"/></sheets></workbook>"#;
+        assert_eq!(find_sheet_rel_id(workbook.as_bytes(), "A & B").as_deref(), Some("rId3"));
+        assert_eq!(find_sheet_rel_id(workbook.as_bytes(), "Missing"), None);
+        let rels = r#"<Relationships><Relationship Id="rId1" Target="worksheets/sheet1.xml"/><Relationship Id="rId3" Target="/xl/worksheets/sheet9.xml"/></Relationships>"#;
+        assert_eq!(
+            find_relationship_target(rels.as_bytes(), "rId3").as_deref(),
+            Some("/xl/worksheets/sheet9.xml")
+        );
+    }
+}